@@ -0,0 +1,56 @@
+"""Byte-level builders for small synthetic Matroska and MP4 files"""
+import struct
+
+MKV_UNKNOWN_SIZE = b"\x01\xff\xff\xff\xff\xff\xff\xff"
+
+
+def vint(value, length=None):
+    length = length or next(size for size in range(1, 9) if value < (1 << (7 * size)) - 1)
+    return ((1 << (7 * length)) | value).to_bytes(length, "big")
+
+
+def element(element_id, payload):
+    return element_id.to_bytes((element_id.bit_length() + 7) // 8, "big") + vint(len(payload)) + payload
+
+
+def uint_element(element_id, value, length=None):
+    return element(element_id, value.to_bytes(length or max(1, (value.bit_length() + 7) // 8), "big"))
+
+
+def string_element(element_id, value):
+    return element(element_id, value.encode())
+
+
+def seek_head(entries):
+    """SeekHead pointing at (element id, offset relative to the segment data) pairs"""
+    return element(0x114D9B74, b"".join(
+        element(0x4DBB, element(0x53AB, element_id.to_bytes(4, "big")) + uint_element(0x53AC, offset, 8))
+        for element_id, offset in entries
+    ))
+
+
+def matroska(segment_children, doc_type="matroska"):
+    """(file bytes, segment data start) for a file holding ``segment_children`` in order"""
+    head = element(0x1A45DFA3, string_element(0x4282, doc_type)) + b"\x18\x53\x80\x67" + MKV_UNKNOWN_SIZE
+    return head + b"".join(segment_children), len(head)
+
+
+def box(box_type, payload):
+    return struct.pack(">I", 8 + len(payload)) + box_type.encode() + payload
+
+
+def full_box(box_type, version, payload):
+    return box(box_type, bytes([version, 0, 0, 0]) + payload)
+
+
+class BytesReader:
+    """In-memory stand-in for MediaRangeReader"""
+
+    def __init__(self, data):
+        self.data = data
+        self.size = len(data)
+        self.reads = 0
+
+    async def read(self, offset, length):
+        self.reads += 1
+        return self.data[offset:offset + length]
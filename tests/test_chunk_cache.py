@@ -0,0 +1,38 @@
+import asyncio
+
+import server
+from server import MediaChunkCache, fetch_block_run
+
+BLOCK_SIZE = 1024
+
+
+def test_block_run_releases_blocks_once_written(tmp_path, monkeypatch):
+    cache = MediaChunkCache(str(tmp_path), BLOCK_SIZE, 1024 * 1024)
+    monkeypatch.setattr(server, "media_chunk_cache", cache)
+    data = bytes(range(256)) * 32  # 8 blocks
+
+    async def fake_download(access_token, item_id, download, headers=None, **kwargs):
+        for start in range(0, len(data), BLOCK_SIZE):
+            yield data[start:start + BLOCK_SIZE]
+
+    monkeypatch.setattr(server, "stream_download", fake_download)
+    download = {"etag": "e1", "size": len(data)}
+    key = cache.key("item", "e1")
+
+    async def run():
+        received = b""
+        pending = []
+        async for offset, chunk in fetch_block_run("token", "item", download, 0, 7):
+            assert offset == len(received)
+            received += chunk
+            # Blocks before the one just received are on disk and no longer held in memory
+            block = offset // BLOCK_SIZE
+            pending.append(sorted(index for cache_key, index in cache.inflight if cache_key == key))
+            assert all(cache.has(key, index) for index in range(block))
+        return received, pending
+
+    received, pending = asyncio.run(run())
+    assert received == data
+    assert pending == [list(range(block, 8)) for block in range(8)]
+    assert cache.inflight == {}
+    assert asyncio.run(cache.read(key, 3)) == data[3 * BLOCK_SIZE:4 * BLOCK_SIZE]
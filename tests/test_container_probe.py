@@ -0,0 +1,100 @@
+import asyncio
+import struct
+
+import pytest
+
+from server import ebml_element_header, ebml_vint, iter_ebml, probe_container
+from tests.media_fixtures import (
+    BytesReader, box, element, full_box, matroska, seek_head, string_element, uint_element
+)
+
+
+def test_ebml_vint_lengths():
+    assert ebml_vint(b"\x81", 0) == (1, 1)
+    assert ebml_vint(b"\x40\x02", 0) == (2, 2)
+    assert ebml_vint(b"\x00\x20\x00\x03", 1) == (3, 3)
+    assert ebml_vint(b"\x1a\x45\xdf\xa3", 0, keep_marker=True) == (0x1A45DFA3, 4)
+
+
+def test_ebml_vint_unknown_size():
+    assert ebml_vint(b"\xff", 0) == (None, 1)
+    assert ebml_vint(b"\x01\xff\xff\xff\xff\xff\xff\xff", 0) == (None, 8)
+
+
+def test_ebml_vint_rejects_bad_input():
+    with pytest.raises(ValueError):
+        ebml_vint(b"\x00", 0)
+    with pytest.raises(IndexError):
+        ebml_vint(b"\x40", 0)
+
+
+def test_element_header_and_children():
+    data = element(0xAE, uint_element(0xD7, 3) + string_element(0x86, "S_TEXT/UTF8"))
+    element_id, data_start, size = ebml_element_header(data, 0)
+    assert (element_id, data_start, size) == (0xAE, 2, len(data) - 2)
+    children = [(child_id, data[start:start + length]) for child_id, start, length in iter_ebml(data, data_start, len(data))]
+    assert children == [(0xD7, b"\x03"), (0x86, b"S_TEXT/UTF8")]
+
+
+def build_mkv():
+    info = element(0x1549A966, uint_element(0x2AD7B1, 1000000) + element(0x4489, struct.pack(">d", 5400500.0)) + string_element(0x7BA9, "Movie"))
+    tracks = element(0x1654AE6B,
+        element(0xAE, uint_element(0xD7, 1) + uint_element(0x83, 1) + string_element(0x86, "V_MPEGH/ISO/HEVC")
+                + uint_element(0x23E383, 41708333) + element(0xE0, uint_element(0xB0, 1920) + uint_element(0xBA, 1080)))
+        + element(0xAE, uint_element(0xD7, 2) + uint_element(0x83, 2) + string_element(0x86, "A_EAC3")
+                  + string_element(0x22B59C, "jpn") + element(0xE1, element(0xB5, struct.pack(">f", 48000.0)) + uint_element(0x9F, 6)))
+        + element(0xAE, uint_element(0xD7, 3) + uint_element(0x83, 17) + string_element(0x86, "S_TEXT/ASS")
+                  + uint_element(0x88, 0) + uint_element(0x55AA, 1) + string_element(0x536E, "Signs")
+                  + element(0x6D80, element(0x6240, element(0x5034, uint_element(0x4254, 0))))))
+    # Tracks sits behind a large Void, so the probe has to follow the SeekHead
+    void = element(0xEC, b"\0" * 300000)
+    cluster = element(0x1F43B675, b"\0" * 1000)
+    cues = element(0x1C53BB6B, b"")
+    head_length = len(seek_head([(0x1654AE6B, 0), (0x1C53BB6B, 0)]))
+    tracks_offset = head_length + len(info) + len(void)
+    cues_offset = tracks_offset + len(tracks) + len(cluster)
+    return matroska([seek_head([(0x1654AE6B, tracks_offset), (0x1C53BB6B, cues_offset)]), info, void, tracks, cluster, cues])
+
+
+def build_mp4():
+    mvhd = full_box("mvhd", 0, b"\0" * 8 + struct.pack(">II", 1000, 7200000) + b"\0" * 80)
+    tkhd = full_box("tkhd", 0, b"\0" * 8 + struct.pack(">I", 1) + b"\0" * 60 + struct.pack(">II", 1280 << 16, 720 << 16))
+    mdhd = full_box("mdhd", 0, b"\0" * 8 + struct.pack(">IIH", 24000, 24000 * 7200, 0x55C4) + b"\0\0")
+    hdlr = full_box("hdlr", 0, b"\0" * 4 + b"vide" + b"\0" * 13)
+    avc1 = box("avc1", b"\0" * 24 + struct.pack(">HH", 1280, 720) + b"\0" * 50)
+    stbl = box("stbl", full_box("stsd", 0, struct.pack(">I", 1) + avc1) + full_box("stts", 0, struct.pack(">III", 1, 100, 1001)))
+    trak = box("trak", tkhd + box("mdia", mdhd + hdlr + box("minf", stbl)))
+    # moov after mdat, as written by most encoders
+    return box("ftyp", b"isom\0\0\0\0") + box("mdat", b"\0" * 200000) + box("moov", mvhd + trak)
+
+
+def test_probe_matroska():
+    data, segment_data_start = build_mkv()
+    probe = asyncio.run(probe_container(BytesReader(data)))
+    assert probe["container"] == "matroska"
+    assert probe["duration"] == 5400.5
+    assert probe["title"] == "Movie"
+    assert probe["resolution"] == "1920x1080"
+    assert (probe["video_codec"], probe["audio_codec"]) == ("h265", "eac3")
+    assert probe["frame_rate"] == 23.976
+    assert (probe["video_tracks"], probe["audio_tracks"], probe["subtitle_tracks"]) == (1, 1, 1)
+    assert probe["segment_data_start"] == segment_data_start
+    assert data[probe["cues_position"]:probe["cues_position"] + 4] == b"\x1c\x53\xbb\x6b"
+    audio, subtitle = probe["tracks"][1], probe["tracks"][2]
+    assert (audio["language"], audio["sample_rate"], audio["channels"]) == ("jpn", 48000, 6)
+    assert (subtitle["name"], subtitle["default"], subtitle["forced"]) == ("Signs", False, True)
+    assert subtitle["compression"] == {"algorithm": 0, "settings": ""}
+
+
+def test_probe_mp4():
+    probe = asyncio.run(probe_container(BytesReader(build_mp4())))
+    assert probe["container"] == "mp4"
+    assert probe["duration"] == 7200.0
+    assert probe["resolution"] == "1280x720"
+    assert probe["video_codec"] == "h264"
+    assert probe["frame_rate"] == 23.976
+    assert probe["tracks"][0]["language"] == "und"
+
+
+def test_probe_unknown_format():
+    assert asyncio.run(probe_container(BytesReader(b"RIFF" + b"\0" * 100))) is None
@@ -0,0 +1,65 @@
+import zlib
+
+from server import SpanBuffer, coalesce_spans, mkv_block_fields, mkv_subtitle_text
+from tests.media_fixtures import element, uint_element
+
+
+def block_payload(track, timestamp, frame, flags=0x80):
+    return bytes([0x80 | track]) + timestamp.to_bytes(2, "big", signed=True) + bytes([flags]) + frame
+
+
+def fields_of(data):
+    element_id = int.from_bytes(data[:1], "big")
+    return mkv_block_fields(data, element_id, 2, len(data) - 2)
+
+
+def test_simple_block():
+    assert fields_of(element(0xA3, block_payload(2, 1500, b"Hi"))) == (2, 1500, None, b"Hi")
+
+
+def test_block_group_with_duration_and_negative_timestamp():
+    group = element(0xA0, element(0xA1, block_payload(3, -20, b"text", flags=0)) + uint_element(0x9B, 2500))
+    assert fields_of(group) == (3, -20, 2500, b"text")
+
+
+def test_laced_or_foreign_elements_are_skipped():
+    assert fields_of(element(0xA3, block_payload(2, 0, b"x", flags=0x82))) is None
+    assert fields_of(element(0xE7, b"\x01\x02\x03\x04")) is None
+    assert fields_of(element(0xA0, uint_element(0x9B, 10))) is None
+
+
+def test_utf8_text_drops_font_tags():
+    track = {"codec_id": "S_TEXT/UTF8"}
+    assert mkv_subtitle_text(track, "<font color=\"red\">Hello,</font> <i>you</i>\r\n".encode()) == "Hello, <i>you</i>"
+
+
+def test_ass_text_takes_the_last_field():
+    track = {"codec_id": "S_TEXT/ASS"}
+    frame = b"12,0,Default,,0,0,0,,{\\b1}One, two\\Nthree & <four>"
+    assert mkv_subtitle_text(track, frame) == "One, two\nthree &amp; &lt;four&gt;"
+
+
+def test_zlib_and_header_stripping_compression():
+    zlib_track = {"codec_id": "S_TEXT/UTF8", "compression": {"algorithm": 0, "settings": ""}}
+    assert mkv_subtitle_text(zlib_track, zlib.compress(b"packed")) == "packed"
+    stripped_track = {"codec_id": "S_TEXT/UTF8", "compression": {"algorithm": 3, "settings": b"Hel".hex()}}
+    assert mkv_subtitle_text(stripped_track, b"lo") == "Hello"
+
+
+def test_coalesce_spans():
+    assert coalesce_spans([(500, 510), (0, 9), (12, 20), (100, 200), (150, 160)], gap=2) == [(0, 20), (100, 200), (500, 510)]
+    assert coalesce_spans([(0, 9), (20, 29)], gap=0) == [(0, 9), (20, 29)]
+    assert coalesce_spans([(0, 9), (10, 19)], gap=0) == [(0, 19)]
+
+
+def test_span_buffer():
+    buffer = SpanBuffer()
+    buffer.add(100, bytes(range(50)))
+    buffer.add(1000, b"abcdef")
+    buffer.add(120, b"xy")
+    assert buffer.read(100, 3) == bytes([0, 1, 2])
+    # A later, shorter span starting inside a longer one does not hide it
+    assert buffer.read(120, 10) == bytes(range(20, 30))
+    assert buffer.read(1002, 4) == b"cdef"
+    assert buffer.read(1002, 5) is None
+    assert buffer.read(50, 1) is None
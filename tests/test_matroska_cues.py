@@ -0,0 +1,58 @@
+from server import CUES_SEEK_PREFETCH_BYTES, MatroskaCuesCache, parse_mkv_cues
+from tests.media_fixtures import element, uint_element
+
+SEGMENT_DATA_START = 52
+
+
+def cue_point(time, *positions):
+    """CuePoint at ``time`` ticks with (track, cluster offset, relative position or None) entries"""
+    payload = uint_element(0xB3, time)
+    for track, cluster, relative in positions:
+        fields = uint_element(0xF7, track) + uint_element(0xF1, cluster)
+        if relative is not None:
+            fields += uint_element(0xF0, relative)
+        payload += element(0xB7, fields)
+    return element(0xBB, payload)
+
+
+def parse(points, track_positions=None):
+    data = b"".join(points)
+    return parse_mkv_cues(data, 0, len(data), SEGMENT_DATA_START, 1000000, track_positions)
+
+
+def test_cues_without_relative_positions():
+    cues = parse([cue_point(5000, (1, 2000, None)), cue_point(0, (1, 100, None))])
+    assert cues == [(0.0, SEGMENT_DATA_START + 100, 1), (5.0, SEGMENT_DATA_START + 2000, 1)]
+
+
+def test_first_track_position_is_the_seek_target():
+    cues = parse([cue_point(1000, (1, 100, None), (2, 100, 40))])
+    assert cues == [(1.0, SEGMENT_DATA_START + 100, 1)]
+
+
+def test_track_positions_keep_every_track_and_relative_position():
+    positions = {}
+    parse([
+        cue_point(0, (1, 100, None)),
+        cue_point(1000, (1, 100, None), (2, 100, 40)),
+        cue_point(2500, (2, 900, 7)),
+    ], positions)
+    assert positions[1] == [(0.0, SEGMENT_DATA_START + 100, None), (1.0, SEGMENT_DATA_START + 100, None)]
+    assert positions[2] == [(1.0, SEGMENT_DATA_START + 100, 40), (2.5, SEGMENT_DATA_START + 900, 7)]
+
+
+def test_timecode_scale_is_applied():
+    data = cue_point(3, (1, 0, None))
+    assert parse_mkv_cues(data, 0, len(data), 0, 500000000) == [(1.5, 0, 1)]
+
+
+def test_cue_lookup_and_cluster_span():
+    entry = {"times": [0.0, 5.0, 10.0], "offsets": [100, 5000, 9000], "tracks": [1, 1, 1], "cues_position": 20000}
+    assert MatroskaCuesCache.cue_for_time(entry, 0) == 0
+    assert MatroskaCuesCache.cue_for_time(entry, 7.5) == 1
+    assert MatroskaCuesCache.cue_for_time(entry, 99) == 2
+    assert MatroskaCuesCache.cluster_span(entry, 0, 30000) == (100, 4999)
+    # The last cluster ends where the Cues start
+    assert MatroskaCuesCache.cluster_span(entry, 2, 30000) == (9000, 19999)
+    big = {**entry, "offsets": [0, 10 * CUES_SEEK_PREFETCH_BYTES, 20 * CUES_SEEK_PREFETCH_BYTES]}
+    assert MatroskaCuesCache.cluster_span(big, 0, 100 * CUES_SEEK_PREFETCH_BYTES) == (0, CUES_SEEK_PREFETCH_BYTES - 1)
@@ -0,0 +1,63 @@
+from server import RANGE_MAX_PARTS, if_range_matches, parse_range_header
+
+
+def test_single_range():
+    assert parse_range_header("bytes=0-99", 1000) == [(0, 99)]
+
+
+def test_end_is_clamped_to_size():
+    assert parse_range_header("bytes=900-5000", 1000) == [(900, 999)]
+
+
+def test_open_ended_range():
+    assert parse_range_header("bytes=500-", 1000) == [(500, 999)]
+
+
+def test_suffix_range():
+    assert parse_range_header("bytes=-100", 1000) == [(900, 999)]
+
+
+def test_suffix_longer_than_file():
+    assert parse_range_header("bytes=-5000", 1000) == [(0, 999)]
+
+
+def test_overlapping_and_adjacent_ranges_are_merged():
+    assert parse_range_header("bytes=500-599, 0-99, 50-149, 150-199", 1000) == [(0, 199), (500, 599)]
+
+
+def test_unsatisfiable_ranges_give_empty_list():
+    assert parse_range_header("bytes=1000-", 1000) == []
+    assert parse_range_header("bytes=2000-3000", 1000) == []
+    assert parse_range_header("bytes=-0", 1000) == []
+
+
+def test_unsatisfiable_parts_are_dropped():
+    assert parse_range_header("bytes=2000-3000, 0-9", 1000) == [(0, 9)]
+
+
+def test_malformed_headers_are_ignored():
+    for value in ("bytes=", "bytes=abc", "bytes=5", "bytes=10-5", "bytes=-", "bytes=1-2-3", "items=0-10", "0-10"):
+        assert parse_range_header(value, 1000) is None, value
+
+
+def test_too_many_parts_are_ignored():
+    value = "bytes=" + ",".join(f"{start}-{start}" for start in range(0, 4 * (RANGE_MAX_PARTS + 1), 4))
+    assert parse_range_header(value, 1000) is None
+
+
+def test_if_range_strong_etag():
+    assert if_range_matches('"abc"', "abc", None)
+    assert if_range_matches('"abc"', '"abc"', None)
+    assert not if_range_matches('"abc"', "other", None)
+    assert not if_range_matches('"abc"', None, None)
+
+
+def test_if_range_weak_etag_never_matches():
+    assert not if_range_matches('W/"abc"', "abc", None)
+
+
+def test_if_range_date_must_match_exactly():
+    date = "Mon, 01 Jan 2024 00:00:00 GMT"
+    assert if_range_matches(date, "abc", date)
+    assert not if_range_matches("Tue, 02 Jan 2024 00:00:00 GMT", "abc", date)
+    assert not if_range_matches(date, "abc", None)
@@ -0,0 +1,141 @@
+import asyncio
+
+from server import (
+    SubtitleConverter, WebVTTWriter, accepted_encodings, convert_srt_to_vtt, convert_subtitle_stream,
+    subtitle_text_encoding
+)
+
+SRT = (
+    "1\r\n00:00:01,500 --> 00:00:03,000\r\nHello, world <font color=\"red\">red</font>\r\n\r\n"
+    "2\r\n00:00:04,000 --> 00:00:05,25\r\n{\\an8}Top, line\r\n<i>second</i>\r\n\r\n"
+)
+
+ASS = """[Script Info]
+Title: Sample
+
+[V4+ Styles]
+Format: Name, Fontname
+Style: Default,Arial
+
+[Events]
+Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
+Dialogue: 0,0:00:10.00,0:00:12.50,Default,,0,0,0,,{\\i1}Later, with comma\\Nsecond line
+Dialogue: 0,0:00:02.00,0:00:03.00,Default,,0,0,0,,Earlier <x> & y
+Comment: 0,0:00:01.00,0:00:02.00,Default,,0,0,0,,not shown
+"""
+
+
+def convert(subtitle_format, text, piece=None):
+    converter = SubtitleConverter(subtitle_format)
+    if piece is None:
+        return converter.feed(text) + converter.finish()
+    output = "".join(converter.feed(text[start:start + piece]) for start in range(0, len(text), piece))
+    return output + converter.finish()
+
+
+def test_srt_timestamps_and_text():
+    assert convert("srt", SRT) == (
+        "WEBVTT\n\n"
+        "00:00:01.500 --> 00:00:03.000\nHello, world red\n\n"
+        "00:00:04.000 --> 00:00:05.250\nTop, line\n<i>second</i>\n\n"
+    )
+
+
+def test_srt_in_small_pieces_matches_whole():
+    assert convert("srt", SRT, piece=7) == convert("srt", SRT)
+
+
+def test_srt_without_trailing_blank_line():
+    assert convert("srt", "1\n00:00:01,000 --> 00:00:02,000\nlast") == "WEBVTT\n\n00:00:01.000 --> 00:00:02.000\nlast\n\n"
+
+
+def test_vtt_input_drops_header_and_notes():
+    text = "WEBVTT\n\nNOTE a comment\n\n00:01.000 --> 00:02.000 align:start\nHi\n\n"
+    assert convert("vtt", "WEBVTT\n\n1\n00:00:01.000 --> 00:00:02.000\nHi\n\n") == "WEBVTT\n\n00:00:01.000 --> 00:00:02.000\nHi\n\n"
+    assert "NOTE" not in convert("vtt", text)
+
+
+def test_vtt_timestamps_without_hours():
+    text = "WEBVTT\n\n00:01.000 --> 00:04.5\nShort\n\n59:59.999 --> 01:00:01.000\nLong\n\n"
+    assert convert("vtt", text) == (
+        "WEBVTT\n\n"
+        "00:00:01.000 --> 00:00:04.500\nShort\n\n"
+        "00:59:59.999 --> 01:00:01.000\nLong\n\n"
+    )
+
+
+def test_srt_escapes_bare_ampersand_and_less_than():
+    text = "1\n00:00:01,000 --> 00:00:02,000\nHello & bye &amp; 1 < 2 <i>kept</i> <c.red>c</c> <3 <00:00:01.500>x\n\n"
+    assert convert("srt", text) == (
+        "WEBVTT\n\n00:00:01.000 --> 00:00:02.000\n"
+        "Hello &amp; bye &amp; 1 &lt; 2 <i>kept</i> <c.red>c</c> &lt;3 <00:00:01.500>x\n\n"
+    )
+
+
+def test_ass_events_keep_commas_drop_overrides_and_sort():
+    assert convert("ass", ASS) == (
+        "WEBVTT\n\n"
+        "00:00:02.000 --> 00:00:03.000\nEarlier &lt;x&gt; &amp; y\n\n"
+        "00:00:10.000 --> 00:00:12.500\nLater, with comma\nsecond line\n\n"
+    )
+
+
+def test_ass_format_line_sets_field_order():
+    text = "[Events]\nFormat: Start, End, Text\nDialogue: 0:00:01.00,0:00:02.00,a, b\n"
+    assert convert("ssa", text) == "WEBVTT\n\n00:00:01.000 --> 00:00:02.000\na, b\n\n"
+
+
+def test_writer_reorders_within_window_and_skips_empty_cues():
+    writer = WebVTTWriter()
+    output = writer.add(40.0, 41.0, "late")
+    output += writer.add(5.0, 6.0, "early")
+    output += writer.add(7.0, 7.0, "zero length")
+    output += writer.add(8.0, 9.0, "   ")
+    output += writer.finish()
+    assert output == "00:00:05.000 --> 00:00:06.000\nearly\n\n00:00:40.000 --> 00:00:41.000\nlate\n\n"
+    assert writer.cues == 2
+
+
+def test_writer_drops_blank_lines_inside_cue_text():
+    writer = WebVTTWriter()
+    assert writer.add(1.0, 2.0, "a\n\nb") + writer.finish() == "00:00:01.000 --> 00:00:02.000\na\nb\n\n"
+
+
+def test_convert_srt_to_vtt_wrapper():
+    assert convert_srt_to_vtt("1\n00:00:01,000 --> 00:00:02,000\nx\n") == "WEBVTT\n\n00:00:01.000 --> 00:00:02.000\nx\n\n"
+
+
+def test_text_encoding_detection():
+    assert subtitle_text_encoding(b"\xff\xfe1\x00") == "utf-16"
+    assert subtitle_text_encoding("café".encode("utf-8")) == "utf-8-sig"
+    # A multi-byte character cut at the end of the first chunk is still UTF-8
+    assert subtitle_text_encoding("café".encode("utf-8")[:-1]) == "utf-8-sig"
+    assert subtitle_text_encoding("café au lait".encode("cp1252")) == "cp1252"
+
+
+def stream(data, piece):
+    async def source():
+        for start in range(0, len(data), piece):
+            yield data[start:start + piece]
+
+    async def collect():
+        return b"".join([chunk async for chunk in convert_subtitle_stream(source(), "srt")]).decode("utf-8")
+
+    return asyncio.run(collect())
+
+
+def test_stream_decodes_bom_utf16_and_cp1252():
+    text = "1\n00:00:01,000 --> 00:00:02,000\nCafé\n\n"
+    expected = "WEBVTT\n\n00:00:01.000 --> 00:00:02.000\nCafé\n\n"
+    assert stream(b"\xef\xbb\xbf" + text.encode("utf-8"), 5) == expected
+    assert stream(text.encode("utf-16"), 5) == expected
+    assert stream(text.encode("cp1252"), 64) == expected
+
+
+def test_accepted_encodings():
+    assert accepted_encodings(None) == ["identity"]
+    assert accepted_encodings("gzip, deflate, br") == ["br", "gzip", "identity"]
+    assert accepted_encodings("gzip;q=0.5, br;q=0") == ["gzip", "identity"]
+    assert accepted_encodings("*") == ["br", "gzip", "identity"]
+    assert accepted_encodings("*;q=0, gzip") == ["gzip", "identity"]
+    assert accepted_encodings("GZIP;q=bogus") == ["identity"]